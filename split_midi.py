@@ -1,19 +1,38 @@
 """A Python module for splitting MIDI files into separate files by channel.
 
 This module provides functionality to split MIDI files into separate files based on
-MIDI channels while preserving meta events. It uses midicsv and csvmidi tools for
-conversion between MIDI and CSV formats.
+MIDI channels while preserving meta events. MIDI files are split in-process with
+mido when it is installed; otherwise, and for CSV input, it uses the midicsv and
+csvmidi tools for conversion between MIDI and CSV formats.
 """
 
 #!/usr/bin/env python3
 
 import sys
 import os
+import functools
+import importlib.util
+import shutil
 import subprocess
-import csv
+import tempfile
+import mmap
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, suppress
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import TYPE_CHECKING, BinaryIO, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+try:
+    import mido
+except ImportError:
+    mido = None
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Optional dependencies that are slow to import, so they are only imported when used
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
 
 # Configure logging
 logging.basicConfig(
@@ -31,8 +50,97 @@ MIDI_EVENTS: Set[str] = {
     'Program_c',
     'Pitch_bend_c'
 }
+# mido message types corresponding to MIDI_EVENTS
+MIDO_EVENTS: Set[str] = {
+    'note_on',
+    'note_off',
+    'control_change',
+    'program_change',
+    'pitchwheel'
+}
+# Matches MIDI event lines, capturing the channel field
+MIDI_EVENT_PATTERN = (
+    r'^[^,]*,[^,]*,\s*(?:' + '|'.join(sorted(MIDI_EVENTS)) + r')\s*,'
+    r'\s*(?P<channel>[^,]*?)\s*(?:,|$)'
+)
+MIDI_EVENTS_BYTES: FrozenSet[bytes] = frozenset(event.encode('ascii') for event in MIDI_EVENTS)
 OUTPUT_DIR_NAME = 'split_channels'
+WRITE_BUFFER_SIZE = 64 * 1024
+# Delimiter pyarrow splits fields at, so that each line is read as one field
+ARROW_DELIMITER = '\x1f'
+UTF8_BOM = b'\xef\xbb\xbf'
 META_EVENT_CHANNEL = -1
+BACKEND_MIDO = 'mido'
+BACKEND_MIDICSV = 'midicsv'
+BACKENDS = (BACKEND_MIDO, BACKEND_MIDICSV)
+# Files with fewer lines are not worth the JIT compilation of the numba kernel
+NUMBA_MIN_LINES = 1_000_000
+
+@functools.lru_cache(maxsize=None)
+def _pyarrow_available() -> bool:
+    """Import pyarrow on first use.
+
+    Returns:
+        bool: True if pyarrow can be imported
+    """
+    try:
+        importlib.import_module('pyarrow.compute')
+        importlib.import_module('pyarrow.csv')
+    except ImportError as e:
+        logger.warning(f"pyarrow cannot be imported, splitting CSV without it: {e}")
+        return False
+    return True
+
+@functools.lru_cache(maxsize=None)
+def _bucket_lines_kernel():
+    """Compile the numba kernel that groups line indices by channel, on first use.
+
+    Returns:
+        The compiled _bucket_lines function, or None if numba cannot be imported
+    """
+    try:
+        import numba  # pylint: disable=import-outside-toplevel
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        logger.warning(f"numba cannot be imported, splitting CSV without it: {e}")
+        return None
+
+    @numba.njit(cache=True)
+    def _bucket_lines(codes, n_channels):
+        """Group line indices by channel in a single pass.
+
+        Args:
+            codes: Channel index of each line, or -1 for meta events
+            n_channels: Number of channels
+
+        Returns:
+            Tuple of the line indices of every channel, meta events included,
+            stored one channel after another in line order, and the start of
+            each channel's indices, with the total length as last element
+        """
+        n_meta = 0
+        counts = np.zeros(n_channels, np.int64)
+        for code in codes:
+            if code < 0:
+                n_meta += 1
+            else:
+                counts[code] += 1
+        starts = np.zeros(n_channels + 1, np.int64)
+        for channel in range(n_channels):
+            starts[channel + 1] = starts[channel] + counts[channel] + n_meta
+        indices = np.empty(starts[n_channels], np.int64)
+        positions = starts[:n_channels].copy()
+        for i, code in enumerate(codes):
+            if code < 0:
+                for channel in range(n_channels):
+                    indices[positions[channel]] = i
+                    positions[channel] += 1
+            else:
+                indices[positions[code]] = i
+                positions[code] += 1
+        return indices, starts
+
+    return _bucket_lines
 
 class MidiSplitterError(Exception):
     """Base exception class for MidiSplitter errors."""
@@ -46,22 +154,39 @@ class MidiSplitter:
 
     Attributes:
         remove_csv (Optional[bool]): Whether to remove CSV files after processing
+        backend (str): Backend used for MIDI input, 'mido' or 'midicsv'
         input_file (Optional[str]): Path to the input file
         csv_file (Optional[str]): Path to the intermediate CSV file
         output_dir (Optional[Path]): Directory for output files
     """
 
-    def __init__(self, remove_csv: Optional[bool] = None) -> None:
+    def __init__(self, remove_csv: Optional[bool] = None, backend: Optional[str] = None) -> None:
         """Initialize the MidiSplitter with configuration options.
 
         Args:
             remove_csv: Whether to remove CSV files after processing. If None,
                        will be determined based on input file type.
+            backend: Backend used to split MIDI files. 'mido' splits in-process,
+                    'midicsv' round-trips through the midicsv and csvmidi tools.
+                    If None, mido is used when installed.
+
+        Raises:
+            MidiSplitterError: If the backend is unknown or not available
         """
+        if backend is None:
+            backend = BACKEND_MIDO if mido is not None else BACKEND_MIDICSV
+        if backend not in BACKENDS:
+            raise MidiSplitterError(f"Error: Unknown backend {backend}")
+        if backend == BACKEND_MIDO and mido is None:
+            raise MidiSplitterError(
+                "Error: mido is not installed. Please install mido or use the midicsv backend."
+            )
         self.remove_csv = remove_csv
+        self.backend = backend
         self.input_file: Optional[str] = None
         self.csv_file: Optional[str] = None
         self.output_dir: Optional[Path] = None
+        self._output_dir_str = ''
 
     def is_midi_file(self, file_path: str) -> bool:
         """Check if the file is a MIDI file based on extension.
@@ -91,12 +216,14 @@ class MidiSplitter:
             subprocess.run(
                 ['midicsv', midi_file, csv_file],
                 check=True,
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
             return csv_file
         except subprocess.CalledProcessError as e:
-            raise MidiSplitterError(f"Error converting MIDI to CSV: {e.stderr}") from e
+            raise MidiSplitterError(
+                f"Error converting MIDI to CSV: {e.stderr.decode(errors='replace')}"
+            ) from e
         except FileNotFoundError as exc:
             raise MidiSplitterError(
                 "Error: midicsv command not found. Please install midicsv."
@@ -119,17 +246,70 @@ class MidiSplitter:
             subprocess.run(
                 ['csvmidi', csv_file, midi_file],
                 check=True,
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
             return midi_file
         except subprocess.CalledProcessError as e:
-            raise MidiSplitterError(f"Error converting CSV to MIDI: {e.stderr}") from e
+            raise MidiSplitterError(
+                f"Error converting CSV to MIDI: {e.stderr.decode(errors='replace')}"
+            ) from e
         except FileNotFoundError as exc:
             raise MidiSplitterError(
                 "Error: csvmidi command not found. Please install midicsv."
             ) from exc
 
+    @contextmanager
+    def _csvmidi_pipe(self, csv_file: str) -> Iterator[BinaryIO]:
+        """Start csvmidi converting a channel CSV piped to its standard input.
+
+        Args:
+            csv_file: Path of the CSV file that is not written; the MIDI file
+                     is named after it
+
+        Yields:
+            BinaryIO: The pipe to write the CSV to. It is closed on exit, after
+            which csvmidi is waited for.
+
+        Raises:
+            MidiSplitterError: If csvmidi fails or is not found
+        """
+        midi_file = csv_file.rsplit('.', 1)[0] + '.mid'
+        # stderr goes to a file, so csvmidi cannot block on a full pipe
+        with ExitStack() as stack:
+            stderr = stack.enter_context(tempfile.TemporaryFile())
+            try:
+                process = stack.enter_context(subprocess.Popen(
+                    ['csvmidi', '-', midi_file],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr
+                ))
+            except FileNotFoundError as exc:
+                raise MidiSplitterError(
+                    "Error: csvmidi command not found. Please install midicsv."
+                ) from exc
+            killed = False
+            try:
+                yield process.stdin
+            except BaseException:
+                if process.poll() is None:
+                    process.kill()
+                    killed = True
+                raise
+            finally:
+                # Writing to a csvmidi that exited early breaks the pipe
+                with suppress(BrokenPipeError):
+                    process.stdin.close()
+                process.wait()
+                # A negative return code means csvmidi was killed by a signal
+                if process.returncode != 0 and not killed:
+                    stderr.seek(0)
+                    error = stderr.read().decode(errors='replace')
+                    if process.returncode < 0 and not error:
+                        error = f"csvmidi was killed by signal {-process.returncode}"
+                    raise MidiSplitterError(f"Error converting CSV to MIDI: {error}")
+
     @staticmethod
     def is_midi_event(event_type: str) -> bool:
         """Check if the event type is a MIDI event that should be split by channel.
@@ -150,88 +330,394 @@ class MidiSplitter:
         """
         self.output_dir = base_path / OUTPUT_DIR_NAME
         self.output_dir.mkdir(exist_ok=True)
+        # Prefix for output file names, so they are built without Path objects
+        self._output_dir_str = str(self.output_dir) + os.sep
         logger.debug(f"Created output directory: {self.output_dir}")
 
-    def _process_midi_events(self, rows: List[List[str]]) -> Tuple[List[int], List[Tuple[int, List[str]]]]:
-        """Process MIDI events and separate them by channel.
+    @staticmethod
+    def _iter_events(csv_file: str) -> Iterator[Tuple[int, bytes]]:
+        """Stream the raw lines of a CSV file from a memory map with their channel.
+
+        Only the event type and channel fields are looked at; the rest of the
+        line is left unparsed. The event type is matched as bytes, inline, since
+        this runs once per line.
 
         Args:
-            rows: List of CSV rows from the input file
+            csv_file: Path to the CSV file to read
+
+        Yields:
+            Tuple[int, bytes]: The channel number for MIDI events, or
+            META_EVENT_CHANNEL otherwise, and the line including its terminator
+        """
+        midi_events = MIDI_EVENTS_BYTES
+        with open(csv_file, 'rb') as f:
+            # Empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                size = len(mm)
+                while pos < size:
+                    end = mm.find(b'\n', pos)
+                    if end == -1:
+                        line = mm[pos:] + b'\n'
+                        end = size
+                    else:
+                        line = mm[pos:end + 1]
+                    pos = end + 1
+                    fields = line.split(b',', 4)
+                    try:
+                        if fields[2].strip() in midi_events:
+                            channel = int(fields[3])
+                        else:
+                            channel = META_EVENT_CHANNEL
+                    except IndexError:
+                        # Lines with too few fields are never MIDI events
+                        channel = META_EVENT_CHANNEL
+                    yield channel, line
+
+    def _open_channel_csv(self, stack: ExitStack, output_file: str) -> BinaryIO:
+        """Open the CSV output for a channel.
+
+        Args:
+            stack: Exit stack that closes the file
+            output_file: Path to the CSV file
 
         Returns:
-            Tuple containing:
-            - List of unique channel numbers
-            - List of tuples (channel, row) for each event
+            BinaryIO: The opened file, or a pipe to csvmidi when CSV files are
+            removed after processing, so they are never written to disk
         """
-        channels: List[int] = []
-        midi_events: List[Tuple[int, List[str]]] = []
+        if self.remove_csv:
+            return stack.enter_context(self._csvmidi_pipe(output_file))
+        return stack.enter_context(open(output_file, 'wb'))
 
-        for row in rows:
-            if len(row) < 3:
-                midi_events.append((META_EVENT_CHANNEL, row))
-            else:
-                event_type = row[2]
-                if self.is_midi_event(event_type) and len(row) > 3:
-                    channel = int(row[3])
-                    if channel not in channels:
-                        channels.append(channel)
-                    midi_events.append((channel, row))
-                else:
-                    midi_events.append((META_EVENT_CHANNEL, row))
+    def _find_channels(self, csv_file: str) -> List[int]:
+        """Find the channels used by the MIDI events in a CSV file.
+
+        Args:
+            csv_file: Path to the CSV file to scan
+
+        Returns:
+            List[int]: Unique channel numbers, in ascending order
+        """
+        channels: Set[int] = set()
+        for channel, _ in self._iter_events(csv_file):
+            if channel != META_EVENT_CHANNEL:
+                channels.add(channel)
+        return sorted(channels)
 
-        return channels, midi_events
+    def _write_channel_files(self, csv_file: str, channels: List[int]) -> List[str]:
+        """Write the events of all channels to separate CSV files in a single pass.
 
-    def _write_channel_file(self, channel: int, midi_events: List[Tuple[int, List[str]]]) -> str:
-        """Write events for a specific channel to a CSV file.
+        Meta events are written to every channel file, MIDI events only to the
+        file of their own channel. Lines are copied as-is, without re-encoding,
+        and collected per channel so each file is written in chunks of about
+        WRITE_BUFFER_SIZE bytes. Consecutive meta lines, such as the header and
+        the end markers, are joined once and shared between all channels.
 
         Args:
-            channel: Channel number to write
-            midi_events: List of all MIDI events
+            csv_file: Path to the CSV file to split
+            channels: Channel numbers to write
 
         Returns:
-            str: Path to the created CSV file
+            List[str]: Paths of the channel CSV files, which are not created
+            when they are piped to csvmidi
+        """
+        with ExitStack() as stack:
+            output_files = {
+                channel: f'{self._output_dir_str}channel_{channel}.csv' for channel in channels
+            }
+            files = {
+                channel: self._open_channel_csv(stack, output_file)
+                for channel, output_file in output_files.items()
+            }
+            buffers = {channel: [] for channel in channels}
+            sizes = dict.fromkeys(channels, 0)
+
+            def append(channel: int, data: bytes) -> None:
+                buffer = buffers[channel]
+                buffer.append(data)
+                sizes[channel] += len(data)
+                if sizes[channel] >= WRITE_BUFFER_SIZE:
+                    files[channel].write(b''.join(buffer))
+                    buffer.clear()
+                    sizes[channel] = 0
+
+            pending_meta = []
+            for channel, line in self._iter_events(csv_file):
+                if channel == META_EVENT_CHANNEL:
+                    pending_meta.append(line)
+                    continue
+                if pending_meta:
+                    # Join each run of meta lines once and share it between all buffers
+                    meta = b''.join(pending_meta)
+                    pending_meta.clear()
+                    for target in channels:
+                        append(target, meta)
+                append(channel, line)
+            # Trailing meta lines, such as End_track and End_of_file
+            meta = b''.join(pending_meta)
+            for channel in channels:
+                buffers[channel].append(meta)
+                files[channel].write(b''.join(buffers[channel]))
+        return list(output_files.values())
+
+    @staticmethod
+    def _select_channel_lines(
+        lines: 'pa.Array', line_channels: 'pa.Array', channels: List[int]
+    ) -> Iterator['pa.Array']:
+        """Select the lines of each channel file with pyarrow.
+
+        Large files are bucketed by the numba kernel in one pass when numba can
+        be imported; otherwise every channel filters all lines with a mask.
+
+        Args:
+            lines: Raw lines of the CSV file
+            line_channels: Channel of each line, null for meta events
+            channels: Channel numbers, in ascending order
+
+        Yields:
+            pa.Array: The meta and MIDI event lines of each channel, in order
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+        bucket_lines = None
+        if HAVE_NUMBA and len(lines) >= NUMBA_MIN_LINES:
+            bucket_lines = _bucket_lines_kernel()
+        if bucket_lines is not None:
+            codes = pc.fill_null(
+                pc.index_in(line_channels, value_set=pa.array(channels, pa.int32())), -1
+            )
+            indices, starts = bucket_lines(codes.to_numpy(), len(channels))
+            for i in range(len(channels)):
+                yield lines.take(indices[starts[i]:starts[i + 1]])
+        else:
+            for channel in channels:
+                yield lines.filter(pc.fill_null(pc.equal(line_channels, channel), True))
+
+    @staticmethod
+    def _arrow_can_read(csv_file: str) -> bool:
+        """Check that pyarrow would read every line of a CSV file unchanged.
+
+        pyarrow treats a carriage return as a line break, also inside text
+        fields and CRLF line endings, would split lines containing
+        ARROW_DELIMITER, and drops a leading UTF-8 byte order mark. Such
+        files, and empty files, are split by the streaming scanner instead,
+        which copies lines byte for byte.
+
+        Args:
+            csv_file: Path to the CSV file to check
+
+        Returns:
+            bool: True if the file can be split with pyarrow
+        """
+        with open(csv_file, 'rb') as f:
+            # Empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return (
+                    mm[:3] != UTF8_BOM
+                    and mm.find(b'\r') == -1
+                    and mm.find(ARROW_DELIMITER.encode()) == -1
+                )
+
+    @staticmethod
+    def _read_lines_arrow(csv_file: str) -> Tuple['pa.Array', 'pa.Array', List[int]]:
+        """Read the lines of a CSV file and find their channels using pyarrow.
+
+        The file is read by pyarrow's multithreaded parser as a single column of
+        raw lines. The channel of every MIDI event is extracted with one
+        vectorized regular expression, so no Python code runs per line. Unlike
+        the streaming path, the whole file is held in memory. Only files
+        accepted by _arrow_can_read are read this way.
+
+        Args:
+            csv_file: Path to the CSV file to read
+
+        Returns:
+            Tuple containing:
+            - The raw lines, without line terminators
+            - The channel of each line, null for meta events
+            - Unique channel numbers, in ascending order
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+        import pyarrow.csv as pacsv  # pylint: disable=import-outside-toplevel
+
+        table = pacsv.read_csv(
+            csv_file,
+            read_options=pacsv.ReadOptions(column_names=['line']),
+            # Each line is read as one unquoted field
+            parse_options=pacsv.ParseOptions(
+                delimiter=ARROW_DELIMITER,
+                quote_char=False,
+                ignore_empty_lines=False
+            ),
+            convert_options=pacsv.ConvertOptions(column_types={'line': pa.large_binary()})
+        )
+        lines = table.column('line').combine_chunks()
+        # Null for meta events
+        line_channels = pc.cast(
+            pc.struct_field(pc.extract_regex(lines, MIDI_EVENT_PATTERN), [0]), pa.int32()
+        )
+        channels = sorted(pc.unique(line_channels.drop_null()).to_pylist())
+        return lines, line_channels, channels
+
+    def _write_channel_files_arrow(
+        self, lines: 'pa.Array', line_channels: 'pa.Array', channels: List[int]
+    ) -> List[str]:
+        """Write lines read by _read_lines_arrow to separate channel CSV files.
+
+        Each channel file is written with a single selection and join.
+
+        Args:
+            lines: Raw lines of the CSV file
+            line_channels: Channel of each line, null for meta events
+            channels: Channel numbers, in ascending order
+
+        Returns:
+            List[str]: Paths of the channel CSV files, which are not created
+            when they are piped to csvmidi
         """
-        output_file = self.output_dir / f'channel_{channel}.csv'
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
-            for event in midi_events:
-                if event[0] == channel or event[0] == META_EVENT_CHANNEL:
-                    writer.writerow(event[1])
-        return str(output_file)
-
-    def process_csv_file(self, csv_file: str) -> None:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+        output_files = []
+        separator = pa.scalar(b'\n', pa.large_binary())
+        # Kept open until all channels are written, so csvmidi processes run concurrently
+        with ExitStack() as stack:
+            for channel, channel_lines in zip(
+                channels, self._select_channel_lines(lines, line_channels, channels)
+            ):
+                joined = pc.binary_join(
+                    pa.LargeListArray.from_arrays(
+                        pa.array([0, len(channel_lines)], pa.int64()), channel_lines
+                    ),
+                    separator
+                )
+                output_file = f'{self._output_dir_str}channel_{channel}.csv'
+                f = self._open_channel_csv(stack, output_file)
+                f.write(joined[0].as_buffer())
+                f.write(b'\n')
+                f.close()
+                output_files.append(output_file)
+        return output_files
+
+    def split_midi_file(self, midi_file: str) -> None:
+        """Split a MIDI file into separate channel files using mido.
+
+        Each track is split into one track per channel, keeping meta events in
+        every track. Delta times are recomputed so that events keep their
+        absolute position in the song.
+
+        Args:
+            midi_file: Path to the MIDI file to split
+
+        Raises:
+            MidiSplitterError: If the MIDI file cannot be read
+        """
+        try:
+            source = mido.MidiFile(midi_file)
+        except (OSError, EOFError, ValueError) as e:
+            raise MidiSplitterError(f"Error reading MIDI file: {e}") from e
+
+        # Create output directory
+        self._create_output_directory(Path(midi_file).parent)
+
+        channels = sorted({
+            msg.channel
+            for track in source.tracks
+            for msg in track
+            if msg.type in MIDO_EVENTS
+        })
+        if len(channels) == 1:
+            # The only channel file would have the same content as the source
+            midi_path = f'{self._output_dir_str}channel_{channels[0]}.mid'
+            shutil.copyfile(midi_file, midi_path)
+            logger.info(f"Created {midi_path}")
+            return
+
+        outputs = {
+            channel: mido.MidiFile(type=source.type, ticks_per_beat=source.ticks_per_beat)
+            for channel in channels
+        }
+
+        for track in source.tracks:
+            split_tracks = {channel: mido.MidiTrack() for channel in channels}
+            last_times = dict.fromkeys(channels, 0)
+            now = 0
+            for msg in track:
+                now += msg.time
+                if msg.type in MIDO_EVENTS:
+                    targets = (msg.channel,)
+                else:
+                    targets = channels
+                for channel in targets:
+                    split_tracks[channel].append(msg.copy(time=now - last_times[channel]))
+                    last_times[channel] = now
+            for channel in channels:
+                outputs[channel].tracks.append(split_tracks[channel])
+
+        for channel, output in outputs.items():
+            midi_path = f'{self._output_dir_str}channel_{channel}.mid'
+            output.save(midi_path)
+            logger.info(f"Created {midi_path}")
+
+    def process_csv_file(self, csv_file: str, source_midi: Optional[str] = None) -> None:
         """Process the CSV file and split it into separate channel files.
 
-        This method reads the CSV file, separates meta events and MIDI events,
-        and creates separate files for each MIDI channel while preserving
-        meta events in each file.
+        Each line is written to the file of its MIDI channel, and meta events
+        are written to every channel file. When pyarrow is installed and can
+        read the file unchanged, the whole file is read into memory and split
+        with vectorized pyarrow kernels. Otherwise the CSV file is streamed
+        twice: once to find the channels in use, and once to split it. The
+        streamed file is memory-mapped and scanned as bytes, and channel files
+        are written in chunks, so on this path memory use does not grow with
+        the size of the file. If remove_csv is set, the channel CSV files are
+        not written to disk but piped to one csvmidi process per channel.
 
         Args:
             csv_file: Path to the CSV file to process
+            source_midi: Path to the MIDI file the CSV file was converted from.
+                        If the CSV file has a single channel, this file and
+                        the CSV file are copied instead of splitting.
         """
-        # Read all rows from the CSV file
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            csv_reader = csv.reader(f, skipinitialspace=True)
-            rows = list(csv_reader)
-
         # Create output directory
         self._create_output_directory(Path(csv_file).parent)
 
-        # Process MIDI events
-        channels, midi_events = self._process_midi_events(rows)
+        # Find the channels used by MIDI events
+        if HAVE_PYARROW and _pyarrow_available() and self._arrow_can_read(csv_file):
+            lines, line_channels, channels = self._read_lines_arrow(csv_file)
+        else:
+            lines = line_channels = None
+            channels = self._find_channels(csv_file)
+
+        if source_midi is not None and len(channels) == 1:
+            # The only channel files would have the same content as the sources
+            output_file = f'{self._output_dir_str}channel_{channels[0]}.csv'
+            midi_file = output_file.rsplit('.', 1)[0] + '.mid'
+            shutil.copyfile(source_midi, midi_file)
+            if not self.remove_csv:
+                shutil.copyfile(csv_file, output_file)
+            logger.info(f"Created {midi_file}")
+            return
 
-        # Process each channel
-        for channel in channels:
-            # Save to CSV
-            output_file = self._write_channel_file(channel, midi_events)
+        # Split all channels to CSV, piped to csvmidi if the CSV files are not kept
+        if lines is not None:
+            output_files = self._write_channel_files_arrow(lines, line_channels, channels)
+        else:
+            output_files = self._write_channel_files(csv_file, channels)
+        midi_files = [output_file.rsplit('.', 1)[0] + '.mid' for output_file in output_files]
 
-            # Convert to MIDI
-            midi_file = self.convert_csv_to_midi(output_file)
-            logger.info(f"Created {midi_file}")
+        if not self.remove_csv:
+            # Convert all channels to MIDI concurrently, one csvmidi process per channel
+            with ThreadPoolExecutor() as executor:
+                list(executor.map(self.convert_csv_to_midi, output_files))
 
-            if self.remove_csv:
-                os.remove(output_file)
-                logger.debug(f"Removed temporary CSV file: {output_file}")
+        for midi_file in midi_files:
+            logger.info(f"Created {midi_file}")
 
     def process_file(self, input_file: str) -> None:
         """Main method to process a file.
@@ -251,19 +737,27 @@ class MidiSplitter:
             raise MidiSplitterError(f"Error: File {input_file} does not exist")
 
         try:
+            # Split MIDI files in-process when mido is available
+            if self.is_midi_file(input_file) and self.backend == BACKEND_MIDO:
+                logger.info(f"Splitting MIDI file {input_file}...")
+                self.split_midi_file(input_file)
+                return
+
             # Check if input is MIDI file
             if self.is_midi_file(input_file):
                 logger.info(f"Converting MIDI file {input_file} to CSV...")
                 self.csv_file = self.convert_midi_to_csv(input_file)
+                source_midi = input_file
                 if self.remove_csv is None:
                     self.remove_csv = True
             else:
                 self.csv_file = input_file
+                source_midi = None
                 if self.remove_csv is None:
                     self.remove_csv = False
 
             logger.info(f"Processing {self.csv_file}...")
-            self.process_csv_file(self.csv_file)
+            self.process_csv_file(self.csv_file, source_midi)
 
             # Clean up temporary CSV file if it was converted from MIDI
             if self.remove_csv:
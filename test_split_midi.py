@@ -6,14 +6,24 @@ for splitting MIDI files into separate files per channel.
 """
 
 import unittest
+import io
 import os
+import sys
 import tempfile
 import shutil
 import subprocess
+import tracemalloc
+from unittest import mock
+import split_midi
 from split_midi import MidiSplitter, MidiSplitterError
 
+try:
+    import mido
+except ImportError:
+    mido = None
+
 class TestMidiSplitter(unittest.TestCase):
-    """Test cases for the MidiSplitter class."""
+    """Test cases for the MidiSplitter class using the midicsv backend."""
 
     @classmethod
     def setUpClass(cls):
@@ -28,7 +38,7 @@ class TestMidiSplitter(unittest.TestCase):
     def setUp(self):
         """Set up test environment before each test."""
         self.test_dir = tempfile.mkdtemp()
-        self.splitter = MidiSplitter(remove_csv=False)
+        self.splitter = MidiSplitter(remove_csv=False, backend='midicsv')
         self._create_test_files()
 
     def tearDown(self):
@@ -136,13 +146,13 @@ class TestMidiSplitter(unittest.TestCase):
             self.assertIn("Key_signature", content)
             self.assertIn("Tempo", content)
             # Should contain channel 1 events
-            self.assertIn("Program_c,1,32", content)
-            self.assertIn("Control_c,1,7,100", content)
-            self.assertIn("Note_on_c,1,40,75", content)
+            self.assertIn("Program_c, 1, 32", content)
+            self.assertIn("Control_c, 1, 7, 100", content)
+            self.assertIn("Note_on_c, 1, 40, 75", content)
             # Should not contain channel 2 events
-            self.assertNotIn("Program_c,2,27", content)
-            self.assertNotIn("Control_c,2,7,100", content)
-            self.assertNotIn("Note_on_c,2,40,80", content)
+            self.assertNotIn("Program_c, 2, 27", content)
+            self.assertNotIn("Control_c, 2, 7, 100", content)
+            self.assertNotIn("Note_on_c, 2, 40, 80", content)
 
         # Test channel 2 content
         channel2_csv = f"{self.test_dir}/split_channels/channel_2.csv"
@@ -154,17 +164,17 @@ class TestMidiSplitter(unittest.TestCase):
             self.assertIn("Key_signature", content)
             self.assertIn("Tempo", content)
             # Should contain channel 2 events
-            self.assertIn("Program_c,2,27", content)
-            self.assertIn("Control_c,2,7,100", content)
-            self.assertIn("Note_on_c,2,40,80", content)
+            self.assertIn("Program_c, 2, 27", content)
+            self.assertIn("Control_c, 2, 7, 100", content)
+            self.assertIn("Note_on_c, 2, 40, 80", content)
             # Should not contain channel 1 events
-            self.assertNotIn("Program_c,1,32", content)
-            self.assertNotIn("Control_c,1,7,100", content)
-            self.assertNotIn("Note_on_c,1,40,75", content)
+            self.assertNotIn("Program_c, 1, 32", content)
+            self.assertNotIn("Control_c, 1, 7, 100", content)
+            self.assertNotIn("Note_on_c, 1, 40, 75", content)
 
     def test_csv_removal(self):
         """Test that CSV files are removed when remove_csv is True."""
-        splitter = MidiSplitter(remove_csv=True)
+        splitter = MidiSplitter(remove_csv=True, backend='midicsv')
         splitter.process_file(f"{self.test_dir}/test.mid")
 
         # Check that MIDI files exist but CSV files don't
@@ -173,5 +183,356 @@ class TestMidiSplitter(unittest.TestCase):
         self.assertFalse(os.path.exists(f"{self.test_dir}/split_channels/channel_1.csv"))
         self.assertFalse(os.path.exists(f"{self.test_dir}/split_channels/channel_2.csv"))
 
+    def test_single_channel_copy(self):
+        """Test that a single-channel MIDI file is copied instead of converted."""
+        single_csv = os.path.join(self.test_dir, "single.csv")
+        with open(single_csv, "w", encoding='utf-8') as f:
+            f.write("0, 0, Header, 0, 1, 96\n")
+            f.write("1, 0, Start_track\n")
+            f.write("1, 0, Tempo, 400000\n")
+            f.write("1, 100, Note_on_c, 3, 40, 75\n")
+            f.write("1, 200, Note_on_c, 3, 40, 0\n")
+            f.write("1, 300, End_track\n")
+            f.write("0, 0, End_of_file\n")
+        single_midi = os.path.join(self.test_dir, "single.mid")
+        subprocess.run(['csvmidi', single_csv, single_midi], check=True)
+
+        self.splitter.process_file(single_midi)
+        with open(single_midi, 'rb') as f:
+            source = f.read()
+        with open(f"{self.test_dir}/split_channels/channel_3.mid", 'rb') as f:
+            self.assertEqual(f.read(), source)
+        self.assertTrue(os.path.exists(f"{self.test_dir}/split_channels/channel_3.csv"))
+
+@unittest.skipIf(mido is None, "mido not installed")
+class TestMidoSplitter(unittest.TestCase):
+    """Test cases for the MidiSplitter class using the mido backend."""
+
+    def setUp(self):
+        """Set up test environment before each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.splitter = MidiSplitter(backend='mido')
+        self._create_test_files()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        shutil.rmtree(self.test_dir)
+
+    def _create_test_files(self):
+        """Create a test MIDI file."""
+        track = mido.MidiTrack([
+            mido.MetaMessage('time_signature', numerator=4, denominator=4, time=0),
+            mido.MetaMessage('key_signature', key='C', time=0),
+            mido.MetaMessage('set_tempo', tempo=400000, time=0),
+            mido.Message('program_change', channel=1, program=32, time=0),
+            mido.Message('control_change', channel=1, control=7, value=100, time=0),
+            mido.Message('program_change', channel=2, program=27, time=0),
+            mido.Message('control_change', channel=2, control=7, value=100, time=0),
+            mido.Message('note_on', channel=1, note=40, velocity=75, time=100),
+            mido.Message('note_on', channel=1, note=40, velocity=0, time=100),
+            mido.Message('note_on', channel=2, note=40, velocity=80, time=100),
+            mido.Message('note_on', channel=2, note=40, velocity=0, time=100),
+            mido.MetaMessage('end_of_track', time=100),
+        ])
+        midi = mido.MidiFile(type=1, ticks_per_beat=96)
+        midi.tracks.append(track)
+        self.test_midi = os.path.join(self.test_dir, "test.mid")
+        midi.save(self.test_midi)
+
+    def _load_channel(self, channel):
+        """Load a split channel file as a list of (absolute time, message) tuples."""
+        midi = mido.MidiFile(f"{self.test_dir}/split_channels/channel_{channel}.mid")
+        self.assertEqual(midi.ticks_per_beat, 96)
+        events = []
+        for track in midi.tracks:
+            now = 0
+            for msg in track:
+                now += msg.time
+                events.append((now, msg))
+        return events
+
+    def test_process_file_midi(self):
+        """Test processing a MIDI file."""
+        self.splitter.process_file(self.test_midi)
+        self.assertTrue(os.path.exists(f"{self.test_dir}/split_channels/channel_1.mid"))
+        self.assertTrue(os.path.exists(f"{self.test_dir}/split_channels/channel_2.mid"))
+        self.assertFalse(os.path.exists(f"{self.test_dir}/split_channels/channel_1.csv"))
+        self.assertFalse(os.path.exists(f"{self.test_dir}/test.csv"))
+
+    def test_channel_content(self):
+        """Test that channel files contain correct events at the original times."""
+        self.splitter.process_file(self.test_midi)
+
+        for channel, start in [(1, 100), (2, 300)]:
+            events = self._load_channel(channel)
+            types = [msg.type for _, msg in events]
+            # Should contain meta events
+            self.assertIn('time_signature', types)
+            self.assertIn('key_signature', types)
+            self.assertIn('set_tempo', types)
+            self.assertEqual((500, 'end_of_track'), (events[-1][0], events[-1][1].type))
+            # Should contain only this channel's events
+            channel_events = [(now, msg) for now, msg in events if not msg.is_meta]
+            self.assertEqual(len(channel_events), 4)
+            self.assertTrue(all(msg.channel == channel for _, msg in channel_events))
+            notes = [now for now, msg in channel_events if msg.type == 'note_on']
+            self.assertEqual(notes, [start, start + 100])
+
+    def test_single_channel_copy(self):
+        """Test that a single-channel MIDI file is copied instead of re-encoded."""
+        midi = mido.MidiFile(type=1, ticks_per_beat=96)
+        midi.tracks.append(mido.MidiTrack([
+            mido.MetaMessage('set_tempo', tempo=400000, time=0),
+            mido.Message('note_on', channel=3, note=40, velocity=75, time=100),
+            mido.Message('note_on', channel=3, note=40, velocity=0, time=100),
+        ]))
+        single_midi = os.path.join(self.test_dir, "single.mid")
+        midi.save(single_midi)
+
+        self.splitter.process_file(single_midi)
+        with open(single_midi, 'rb') as f:
+            source = f.read()
+        with open(f"{self.test_dir}/split_channels/channel_3.mid", 'rb') as f:
+            self.assertEqual(f.read(), source)
+
+    def test_nonexistent_file(self):
+        """Test handling of nonexistent file."""
+        with self.assertRaises(MidiSplitterError):
+            self.splitter.process_file(f"{self.test_dir}/nonexistent.mid")
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected."""
+        with self.assertRaises(MidiSplitterError):
+            MidiSplitter(backend='timidity')
+
+class RecordingPipe(io.BytesIO):
+    """Standard input of a mocked csvmidi process, keeping the data piped to it."""
+
+    def __init__(self, piped, midi_file):
+        super().__init__()
+        self.piped = piped
+        self.midi_file = midi_file
+
+    def close(self):
+        if not self.closed:
+            self.piped[self.midi_file] = self.getvalue()
+        super().close()
+
+def fake_csvmidi(piped, returncode=0, error=b''):
+    """Create a replacement for subprocess.Popen that mocks csvmidi reading a pipe."""
+    def popen(args, stdin, stderr, **_):
+        assert args[:2] == ['csvmidi', '-'] and stdin == subprocess.PIPE
+        stderr.write(error)
+        process = mock.MagicMock(returncode=None)
+        process.__enter__.return_value = process
+        process.stdin = RecordingPipe(piped, os.path.basename(args[2]))
+        process.poll.return_value = None
+
+        def wait():
+            process.returncode = returncode
+            return returncode
+        process.wait.side_effect = wait
+        return process
+    return popen
+
+class CsvSplittingMixin:
+    """Tests splitting CSV files without converting them to MIDI, shared by each split path."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Set up test environment before each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.splitter = MidiSplitter(remove_csv=False, backend='midicsv')
+        self.test_csv = os.path.join(self.test_dir, "test.csv")
+        self._write_csv([
+            "0, 0, Header, 0, 1, 96\n",
+            "1, 0, Start_track\n",
+            "1, 0, Text_t, \"Note_on_c, 3\"\n",
+            "1, 0, Program_c, 1, 32\n",
+            "1, 0, Program_c, 10, 27\n",
+            "1, 100, Note_on_c, 1, 40, 75\n",
+            "1, 200, Note_on_c, 10, 40, 80\n",
+            "1, 300, Channel_aftertouch_c, 1, 64\n",
+            "1, 500, End_track\n",
+            "0, 0, End_of_file",
+        ])
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Clean up after each test."""
+        shutil.rmtree(self.test_dir)
+
+    def _write_csv(self, lines):
+        """Write the test CSV file."""
+        with open(self.test_csv, "w", encoding='utf-8', newline='') as f:
+            f.writelines(lines)
+
+    def _split(self, measure_memory=False):
+        """Split the test CSV file without converting to MIDI and read the channel files.
+
+        If measure_memory is set, the peak memory traced while splitting is
+        returned along with the contents.
+        """
+        with mock.patch.object(MidiSplitter, 'convert_csv_to_midi', side_effect=lambda path: path):
+            if measure_memory:
+                tracemalloc.start()
+                try:
+                    self.splitter.process_csv_file(self.test_csv)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+            else:
+                self.splitter.process_csv_file(self.test_csv)
+        output_dir = os.path.join(self.test_dir, "split_channels")
+        contents = {}
+        for name in os.listdir(output_dir):
+            with open(os.path.join(output_dir, name), 'rb') as f:
+                contents[name] = f.read()
+        shutil.rmtree(output_dir)
+        return (contents, peak) if measure_memory else contents
+
+    def test_single_channel_copy(self):
+        """Test that a single-channel CSV converted from MIDI is copied without splitting."""
+        self._write_csv([
+            "0, 0, Header, 0, 1, 96\n",
+            "1, 0, Start_track\n",
+            "1, 100, Note_on_c, 3, 40, 75\n",
+            "1, 200, Note_on_c, 3, 40, 0\n",
+            "1, 300, End_track\n",
+            "0, 0, End_of_file\n",
+        ])
+        source_midi = os.path.join(self.test_dir, "test.mid")
+        with open(source_midi, 'wb') as f:
+            f.write(b'MThd source')
+        output_dir = os.path.join(self.test_dir, "split_channels")
+
+        for remove_csv in (False, True):
+            with self.subTest(remove_csv=remove_csv):
+                splitter = MidiSplitter(remove_csv=remove_csv, backend='midicsv')
+                with mock.patch.object(split_midi.subprocess, 'Popen') as popen, \
+                        mock.patch.object(split_midi.subprocess, 'run') as run:
+                    splitter.process_csv_file(self.test_csv, source_midi)
+                popen.assert_not_called()
+                run.assert_not_called()
+                expected = ['channel_3.mid'] if remove_csv else ['channel_3.csv', 'channel_3.mid']
+                self.assertEqual(sorted(os.listdir(output_dir)), expected)
+                with open(os.path.join(output_dir, "channel_3.mid"), 'rb') as f:
+                    self.assertEqual(f.read(), b'MThd source')
+                shutil.rmtree(output_dir)
+
+    def test_csv_piped_to_csvmidi(self):
+        """Test that channel CSVs are piped to csvmidi instead of written when removing CSVs."""
+        expected = self._split()
+        piped = {}
+        splitter = MidiSplitter(remove_csv=True, backend='midicsv')
+        with mock.patch.object(split_midi.subprocess, 'Popen', side_effect=fake_csvmidi(piped)):
+            splitter.process_csv_file(self.test_csv)
+        self.assertEqual(os.listdir(os.path.join(self.test_dir, "split_channels")), [])
+        self.assertEqual(piped, {
+            'channel_1.mid': expected['channel_1.csv'],
+            'channel_10.mid': expected['channel_10.csv'],
+        })
+
+    def test_csvmidi_pipe_error(self):
+        """Test that a failing csvmidi reading a pipe raises its error message."""
+        splitter = MidiSplitter(remove_csv=True, backend='midicsv')
+        popen = fake_csvmidi({}, returncode=1, error=b'Bad event')
+        with mock.patch.object(split_midi.subprocess, 'Popen', side_effect=popen):
+            with self.assertRaisesRegex(MidiSplitterError, 'Bad event'):
+                splitter.process_csv_file(self.test_csv)
+
+    def test_csvmidi_pipe_killed(self):
+        """Test that a csvmidi killed by a signal while reading a pipe raises an error."""
+        splitter = MidiSplitter(remove_csv=True, backend='midicsv')
+        popen = fake_csvmidi({}, returncode=-9)
+        with mock.patch.object(split_midi.subprocess, 'Popen', side_effect=popen):
+            with self.assertRaisesRegex(MidiSplitterError, 'killed by signal 9'):
+                splitter.process_csv_file(self.test_csv)
+
+@mock.patch.object(split_midi, 'HAVE_PYARROW', False)
+class TestStreamingSplitting(CsvSplittingMixin, unittest.TestCase):
+    """Test cases for splitting CSV files with the streaming mmap scanner."""
+
+    @mock.patch.object(split_midi, 'WRITE_BUFFER_SIZE', 1024)
+    def test_bounded_write_buffers(self):
+        """Test that meta lines do not pile up in the buffer of a channel that went silent."""
+        lines = ["0, 0, Header, 0, 1, 96\n", "1, 0, Start_track\n", "1, 0, Note_on_c, 1, 40, 75\n"]
+        for i in range(20000):
+            lines.append(f"1, {i}, Note_on_c, 2, 40, 80\n")
+            lines.append(f"1, {i}, Channel_aftertouch_c, 2, 64\n")
+        lines += ["1, 20000, End_track\n", "0, 0, End_of_file\n"]
+        self._write_csv(lines)
+
+        files, peak = self._split(measure_memory=True)
+        self.assertLess(peak, 256 * 1024)
+        meta = [line for line in lines if 'Note_on_c' not in line]
+        self.assertEqual(
+            files['channel_1.csv'].decode(), ''.join([meta[0], meta[1], lines[2]] + meta[2:])
+        )
+        self.assertEqual(files['channel_2.csv'].decode(), ''.join(lines[:2] + lines[3:]))
+
+    def test_pyarrow_import_error(self):
+        """Test that CSV files are streamed when pyarrow is installed but cannot be imported."""
+        # pylint: disable=protected-access
+        expected = self._split()
+        split_midi._pyarrow_available.cache_clear()
+        self.addCleanup(split_midi._pyarrow_available.cache_clear)
+        # None in sys.modules makes importing a module raise ImportError
+        broken = {name: None for name in list(sys.modules) if name.split('.')[0] == 'pyarrow'}
+        broken['pyarrow'] = None
+        with mock.patch.object(split_midi, 'HAVE_PYARROW', True), \
+                mock.patch.dict(sys.modules, broken):
+            with self.assertLogs(split_midi.logger, 'WARNING'):
+                self.assertEqual(self._split(), expected)
+
+@unittest.skipIf(not split_midi.HAVE_PYARROW, "pyarrow not installed")
+class TestArrowSplitting(CsvSplittingMixin, unittest.TestCase):
+    """Test cases for splitting CSV files with pyarrow."""
+
+    def test_matches_streaming_split(self):
+        """Test that the pyarrow split writes the same files as the streaming split."""
+        with open(self.test_csv, encoding='utf-8', newline='') as f:
+            lines = f.readlines()
+        variants = {
+            'lf': lines,
+            'blank line': lines[:4] + ["\n"] + lines[4:],
+            'crlf': [line.replace("\n", "\r\n") for line in lines],
+            'carriage return in text': lines[:2] + ["1, 0, Text_t, \"a\rb\"\n"] + lines[2:],
+            'delimiter in text': lines[:2] + ["1, 0, Text_t, \"a\x1fb\"\n"] + lines[2:],
+            'byte order mark': ["\ufeff" + lines[0]] + lines[1:],
+        }
+        for name, variant in variants.items():
+            with self.subTest(name):
+                self._write_csv(variant)
+                arrow_files = self._split()
+                with mock.patch.object(split_midi, 'HAVE_PYARROW', False):
+                    stream_files = self._split()
+                self.assertEqual(sorted(arrow_files), ['channel_1.csv', 'channel_10.csv'])
+                self.assertEqual(arrow_files, stream_files)
+                for line in variant[2:3]:
+                    self.assertIn(line.encode(), arrow_files['channel_1.csv'])
+
+    @unittest.skipIf(not split_midi.HAVE_NUMBA, "numba not installed")
+    def test_numba_matches_streaming_split(self):
+        """Test that the numba bucketing writes the same files as the streaming split."""
+        with mock.patch.object(split_midi, 'NUMBA_MIN_LINES', 0):
+            numba_files = self._split()
+        with mock.patch.object(split_midi, 'HAVE_PYARROW', False):
+            stream_files = self._split()
+        self.assertEqual(sorted(numba_files), ['channel_1.csv', 'channel_10.csv'])
+        self.assertEqual(numba_files, stream_files)
+
+    @mock.patch.object(split_midi, 'HAVE_NUMBA', True)
+    @mock.patch.object(split_midi, 'NUMBA_MIN_LINES', 0)
+    def test_numba_import_error(self):
+        """Test that lines are filtered with masks when numba is installed but fails to import."""
+        # pylint: disable=protected-access
+        split_midi._bucket_lines_kernel.cache_clear()
+        self.addCleanup(split_midi._bucket_lines_kernel.cache_clear)
+        with mock.patch.dict(sys.modules, {'numba': None}):
+            with self.assertLogs(split_midi.logger, 'WARNING'):
+                arrow_files = self._split()
+        with mock.patch.object(split_midi, 'HAVE_PYARROW', False):
+            stream_files = self._split()
+        self.assertEqual(arrow_files, stream_files)
+
 if __name__ == '__main__':
     unittest.main()